@@ -0,0 +1,137 @@
+import ctypes
+import os
+import sys
+
+import numpy as np
+
+# =========================
+# Ray Casting Kernels (Numba JIT)
+# =========================
+# numba가 설치되어 있지 않으면 njit을 그대로 통과시키는 데코레이터로 대체한다.
+# (이 경우 visibility_engine 쪽에서 NumPy 경로를 사용한다)
+# fastmath는 쓰지 않는다: 플레이어가 벽 위에 있을 때 t ~ 0 판정이 NumPy 경로와 달라진다.
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+@njit(inline="always")
+def ray_segment_intersection(ox, oy, dx, dy, ax, ay, bx, by):
+    # 레이 하나 - 벽 하나 교차 판정. 모든 일괄 커널(전체 검사, BVH)이 이 함수를 쓴다
+    # (ox, oy) : 레이가 시작되는 점(플레이어 위치)
+    # (dx, dy) : 레이의 방향 단위 벡터
+    # (ax, ay), (bx, by) : 선분의 두 끝점
+    # t : 레이 식 "origin + t * direction"에서의 이동량
+    # u : 선분 식 "a + u * (b - a)"에서의 상대 위치(0~1 범위일 때 교차)
+    # origin + t * direction = a + u*(b-a)
+    # 교차하면 t, 아니면 inf 를 반환한다 (가장 가까운 벽 고르기는 호출하는 쪽에서)
+    v1x = ox - ax
+    v1y = oy - ay
+    # 두 끝점이 모두 레이 뒤쪽(방향과의 내적 < 0)이면 t < 0 이므로 나눗셈 전에 제외
+    if v1x * dx + v1y * dy > 0 and (ox - bx) * dx + (oy - by) * dy > 0:
+        return np.inf
+    v2x = bx - ax
+    v2y = by - ay
+    denom = dx * v2y - dy * v2x
+    if abs(denom) < 1e-6:
+        return np.inf
+    t = (v2x * v1y - v2y * v1x) / denom
+    if t < 0:
+        return np.inf
+    u = (dx * v1y - dy * v1x) / denom
+    if u < 0 or u > 1:
+        return np.inf
+    return t
+
+
+@njit(cache=True)
+def cast_all_rays(ox, oy, dirx, diry, p1x, p1y, p2x, p2y, max_dist=1000.0):
+    # 모든 레이를 한 번에 캐스팅한다
+    # dirx/diry : (A,) float64 레이 방향 (cos, sin - 호출하는 쪽에서 한 번에 계산)
+    # p1x/p1y/p2x/p2y : (W,) float64
+    # 반환 (hitx, hity, hit_idx) - 맞은 벽이 없으면 hit_idx = -1
+    n_rays = dirx.shape[0]
+    n_walls = p1x.shape[0]
+    hitx = np.empty(n_rays)
+    hity = np.empty(n_rays)
+    hit_idx = np.full(n_rays, -1, dtype=np.int32)
+
+    for r in range(n_rays):
+        dx = dirx[r]
+        dy = diry[r]
+        closest_t = max_dist
+        for w in range(n_walls):
+            t = ray_segment_intersection(ox, oy, dx, dy, p1x[w], p1y[w], p2x[w], p2y[w])
+            # 같은 거리면 먼저 나온(인덱스가 작은) 벽을 유지한다
+            if t < closest_t:
+                closest_t = t
+                hit_idx[r] = w
+        hitx[r] = ox + dx * closest_t
+        hity[r] = oy + dy * closest_t
+
+    return hitx, hity, hit_idx
+
+
+def warm_up():
+    # 첫 프레임에서 JIT 컴파일이 일어나지 않도록 씬 로드 시 미리 한 번 호출한다
+    if not NUMBA_AVAILABLE:
+        return
+    dummy = np.zeros(1)
+    # max_dist 도 명시해서 실제 호출(cast_rays)과 같은 시그니처로 컴파일되게 한다
+    cast_all_rays(0.0, 0.0, dummy + 1.0, dummy, dummy, dummy, dummy + 1.0, dummy + 1.0, 1000.0)
+
+
+# =========================
+# Ray Casting Kernel (C / ctypes)
+# =========================
+# vis_kernel.c 를 빌드한 공유 라이브러리가 이 파일 옆에 있으면 사용한다.
+# 없으면 C_KERNEL_AVAILABLE = False 이고 numba / NumPy 경로로 대체된다.
+
+def _load_c_kernel():
+    name = "vis_kernel.dll" if sys.platform.startswith("win") else "vis_kernel.so"
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    if not os.path.exists(path):
+        return None
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError:
+        return None
+    f8 = np.ctypeslib.ndpointer(dtype=np.float64, flags="C_CONTIGUOUS")
+    i4 = np.ctypeslib.ndpointer(dtype=np.int32, flags="C_CONTIGUOUS")
+    fn = lib.cast_all_rays
+    fn.argtypes = [
+        ctypes.c_double, ctypes.c_double,
+        f8, f8, ctypes.c_int,
+        f8, f8, f8, f8, ctypes.c_int,
+        ctypes.c_double, f8, i4,
+    ]
+    fn.restype = None
+    return fn
+
+
+_c_cast_all_rays = _load_c_kernel()
+C_KERNEL_AVAILABLE = _c_cast_all_rays is not None
+# 레이 x 벽 쌍이 이보다 적으면 OpenMP 스레드 시작 비용 때문에 numba 커널이 더 빠르다
+# (BVH 를 쓰는 씬에서는 C 커널을 쓰지 않는다 - BVH 가 훨씬 빠름)
+C_KERNEL_MIN_WORK = 50_000
+
+
+def cast_all_rays_c(ox, oy, dirx, diry, p1x, p1y, p2x, p2y, max_dist=1000.0):
+    # 파이썬 경계는 프레임당 한 번만 넘는다. 반환은 cast_all_rays 와 같다 (hitx, hity, hit_idx)
+    n_rays = len(dirx)
+    out_t = np.empty(n_rays)
+    out_wall = np.empty(n_rays, dtype=np.int32)
+    _c_cast_all_rays(
+        float(ox), float(oy), dirx, diry, n_rays,
+        p1x, p1y, p2x, p2y, len(p1x),
+        float(max_dist), out_t, out_wall,
+    )
+    return ox + dirx * out_t, oy + diry * out_t, out_wall
@@ -1,6 +1,12 @@
 import math
+import numpy as np
 import pygame
 
+from vis_kernels import (
+    C_KERNEL_AVAILABLE, C_KERNEL_MIN_WORK, NUMBA_AVAILABLE, cast_all_rays, cast_all_rays_c, warm_up
+)
+from walls_bvh import BVH_MIN_WALLS, build_bvh, cast_all_rays_bvh, warm_up as warm_up_bvh
+
 # =========================
 # Math / Geometry Utilities
 # =========================
@@ -32,6 +38,9 @@ class Vec2:
     def length(self): # 벡터의 크기 계산
         return math.hypot(self.x, self.y)
 
+    def length_sq(self): # 벡터 크기의 제곱 (0 과 비교할 때는 sqrt 가 필요 없음)
+        return self.x * self.x + self.y * self.y
+
     def normalized(self): # 벡터 정규화
         l = self.length()
         if l == 0:
@@ -58,8 +67,8 @@ class Segment:
     __slots__ = ("p1", "p2")
 
     def __init__(self, p1, p2):
-        self.p1 = p1  # 벡터 1
-        self.p2 = p2  # 벡터 2
+        self.p1 = p1  # (x, y) 튜플 1
+        self.p2 = p2  # (x, y) 튜플 2
 
     def points(self):
         return self.p1, self.p2
@@ -70,201 +79,186 @@ class Wall:
     # angular_apeed : 벽의 각속도(라디안/초)
     # rotation_center : 회전의 기준점
     # self.angle : 프레임마다 누적되는 회전값
+    # 동적 벽의 이동/회전은 Scene.update 가 동적 벽 배열(dyn_seg 등)로 한 번에 처리하고 결과를 segment 에 써 준다
     def __init__(self, p1, p2, dynamic=False, rotation_center=None, angular_speed=0.0, velocity=None):
-        self.base_p1 = Vec2(p1.x, p1.y)
-        self.base_p2 = Vec2(p2.x, p2.y)
-        self.segment = Segment(Vec2(p1.x, p1.y), Vec2(p2.x, p2.y))
+        # 내부 좌표는 Vec2 대신 (x, y) 튜플로 보관 (매 연산마다 객체 생성 방지)
+        self.base_p1 = (p1.x, p1.y)
+        self.base_p2 = (p2.x, p2.y)
+        self.segment = Segment(self.base_p1, self.base_p2)
 
         #Dynamics
         self.dynamic = dynamic
-        self.rotation_center = rotation_center  # 벡터2 혹은 없음
+        self.rotation_center = rotation_center.tuple() if rotation_center is not None else None  # (x, y) 혹은 없음
         self.angular_speed = angular_speed     # radians per second
         self.velocity = velocity or Vec2(0, 0) # 속도
         self.angle = 0.0
 
-    def update(self, dt): # Wall.update
-        if not self.dynamic:
-            return
-
-        # 회전
-        if self.rotation_center is not None and self.angular_speed != 0.0:
-            self.angle += self.angular_speed * dt
-            # 회전 중심점을 기준으로 베이스 포인트를 회전시킨다
-            self.segment.p1 = rotate_around(self.base_p1, self.rotation_center, self.angle)
-            self.segment.p2 = rotate_around(self.base_p2, self.rotation_center, self.angle)
-        # 평행 이동
-        if self.velocity.x != 0 or self.velocity.y != 0:
-            dp = self.velocity * dt
-            self.segment.p1 = self.segment.p1 + dp
-            self.segment.p2 = self.segment.p2 + dp
-
     def get_segment(self):
         return self.segment
 
 
-def rotate_around(point, center, angle):
-    # 각도 중심으로 포인트 회전
-    translated = point - center
-    c = math.cos(angle)
-    s = math.sin(angle)
-    rotated = Vec2(
-        translated.x * c - translated.y * s,
-        translated.x * s + translated.y * c
-    )
-    return center + rotated
-
-
 # =========================
 # Visibility Engine
 # =========================
 
 class VisibilityEngine:
-    def __init__(self, walls):
-        # walls: list[Wall]
-        self.walls = walls
+    # 끝점 각도 사이가 이보다 벌어지면 그 사이에 균일 샘플을 추가한다 (라디안)
+    MAX_GAP_360 = math.pi / 16
+    MAX_GAP_FOV = math.pi / 32
+
+    def __init__(self, scene):
+        # scene: Scene (정적/동적 벽 배열을 함께 사용)
+        self.scene = scene
+        self.walls = scene.get_walls()
+        # JIT 커널 예열 (numba가 없으면 아무것도 하지 않음)
+        warm_up()
+        warm_up_bvh(scene.static_bvh)
 
     def compute_visibility_polygon(self, origin, facing_angle, fov_angle, full_360=False):
         # origin : 벡터 2 (플레이어 위치)
         # facing_angle : 방향 라디안
         # fov_angle : 시야각 라디안 (360도 모드 = False일 때만 사용)
-        # 반환 (points, hit_walls)
-        # points : list[Vec2], 가시 폴리곤
-        # hit_walls : 모든 ray에 대하여 hit된 벽들 모음
+        # 반환 (points, hit_mask)
+        # points : (A, 2) float64 ndarray, 가시 폴리곤 꼭짓점 (x, y)
+        # hit_mask : (len(walls),) bool ndarray, ray에 hit된 벽이면 True (walls 와 같은 인덱스)
         eps = 1e-3
-        angles = []
-
-        # 모든 벽 끝점 기준으로 후보 각도 생성
-        for wall in self.walls:
-            seg = wall.get_segment()
-            for p in (seg.p1, seg.p2):
-                rel = p - origin
-                angle = math.atan2(rel.y, rel.x)
-                angles.extend([angle - eps, angle, angle + eps])
-
-        # 360도 모드면 전체 각도 샘플, 아니면 FOV 주변 추가 샘플
-        if full_360:
-            steps = 64
-            for i in range(steps):
-                a = -math.pi + 2 * math.pi * i / steps
-                angles.append(a)
-        else:
-            steps = 32
+        packed = self.pack_walls()
+        p1x, p1y, p2x, p2y = packed
+
+        # 모든 벽 끝점 기준으로 후보 각도 생성 (벽마다 p1, p2 순서, 각각 -eps / 0 / +eps)
+        ends_x = np.stack((p1x, p2x), axis=1).ravel()
+        ends_y = np.stack((p1y, p2y), axis=1).ravel()
+        ends = np.arctan2(ends_y - origin.y, ends_x - origin.x)
+        angles = (ends[:, None] + np.array([-eps, 0.0, eps])).ravel()
+
+        # FOV 모드면 시야 양 끝 경계 각도는 항상 포함
+        # (고정 개수의 균일 샘플 대신, 아래에서 벌어진 간격만 채운다)
+        if not full_360:
             half = fov_angle / 2.0
-            for i in range(steps + 1):
-                t = -half + fov_angle * i / steps
-                angles.append(facing_angle + t)
-
-        # 정규화 + FOV 필터링
-        unique_angles = []
-        seen = set()
-        for a in angles:
-            # Normalize to [-pi, pi]
-            a = math.atan2(math.sin(a), math.cos(a))
-            key = round(a, 4)
-            if key in seen:
-                continue
-            seen.add(key)
-            if not full_360:
-                # 시야각(FOV)을 facing angle 주변으로 제한한다
-                diff = angle_diff(a, facing_angle)
-                if abs(diff) > fov_angle / 2.0:
-                    continue
-            unique_angles.append(a)
-
-        unique_angles.sort()
-
-        points = []
-        hit_walls = set()
-
-        for a in unique_angles:
-            hit_point, hit_wall = self.cast_ray(origin, a)
-            if hit_point is not None:
-                points.append((a, hit_point))
-                if hit_wall is not None:
-                    hit_walls.add(hit_wall)
+            angles = np.concatenate((angles, [facing_angle - half, facing_angle + half]))
+
+        # 정규화 + 중복 제거 + FOV 필터링 (NumPy 벡터 연산)
+        # Normalize to [-pi, pi)
+        angles = (angles + math.pi) % (2 * math.pi) - math.pi
+        # 소수 넷째 자리까지 같은 각도는 하나로 본다 (처음 나온 값 유지, 결과는 정렬됨)
+        keys = np.round(angles * 1e4).astype(np.int64)
+        _, first = np.unique(keys, return_index=True)
+        unique_angles = angles[first]
 
         if full_360:
-            # 360도 모드는 그냥 절대각도로 정렬
-            unique_angles.sort()
-            ordered_angles = unique_angles
+            # 360도 모드는 그냥 절대각도로 정렬 (np.unique 결과가 이미 정렬되어 있음)
+            # 끝점 각도 사이(마지막 -> 처음 구간 포함)가 너무 벌어진 곳만 샘플 추가
+            fillers = angle_gap_fillers(unique_angles, self.MAX_GAP_360, period=2 * math.pi)
+            fillers = (fillers + math.pi) % (2 * math.pi) - math.pi
+            ordered_angles = np.sort(np.concatenate((unique_angles, fillers)))
         else:
-            # FOV 모드: 바라보는 각도 기준의 상대각(diff)으로 정렬
-            angle_pairs = []
-            for a in unique_angles:
-                diff = angle_diff(a, facing_angle)   # [-pi, pi] 범위의 상대각
-                angle_pairs.append((diff, a))
-
-            angle_pairs.sort(key=lambda x: x[0])      # diff 기준으로 정렬
-            ordered_angles = [a for diff, a in angle_pairs]
-
-        points = []
-        hit_walls = set()
-
-        for a in ordered_angles:
-            hit_point, hit_wall = self.cast_ray(origin, a)
-            if hit_point is not None:
-                points.append((a, hit_point))
-                if hit_wall is not None:
-                    hit_walls.add(hit_wall)
-
-        # Sort by angle and return positions only
-        #points.sort(key=lambda ap: ap[0])
-        poly_points = [p for _, p in points]
-
-        return poly_points, hit_walls
-
-    def cast_ray(self, origin, angle, max_dist=1000.0):
+            # 시야각(FOV)을 facing angle 주변으로 제한하고,
+            # 바라보는 각도 기준의 상대각(diff)으로 정렬
+            diff = (unique_angles - facing_angle + math.pi) % (2 * math.pi) - math.pi
+            # (나머지 연산의 반올림 오차로 FOV 경계 샘플이 빠지지 않도록 작은 여유를 둔다)
+            inside = np.abs(diff) <= fov_angle / 2.0 + 1e-9
+            order = np.argsort(diff[inside], kind="stable")
+            diff = diff[inside][order]
+            fill_diff = angle_gap_fillers(diff, self.MAX_GAP_FOV)
+            ordered_angles = np.concatenate((unique_angles[inside][order], facing_angle + fill_diff))
+            ordered_angles = ordered_angles[np.argsort(np.concatenate((diff, fill_diff)), kind="stable")]
+
+        hit_x, hit_y, hit_idx = self.cast_rays(origin, ordered_angles, packed=packed)
+
+        # 맞은 레이만 마스크로 골라내고, 맞은 벽은 인덱스로 bool 마스크에 표시한다
+        hit = hit_idx >= 0
+        poly_points = np.column_stack((hit_x[hit], hit_y[hit]))
+        hit_mask = np.zeros(len(self.walls), dtype=bool)
+        hit_mask[hit_idx[hit]] = True
+
+        return poly_points, hit_mask
+
+    def pack_walls(self):
+        # 정적 벽 배열(한 번만 생성) + 동적 벽 배열(매 프레임 갱신)을 이어 붙여
+        # SoA(p1x, p1y, p2x, p2y) 형태의 연속된 float64 배열로 만든다
+        # 인덱스 순서는 scene.walls 와 같다
+        seg = np.concatenate((self.scene.static_seg, self.scene.dyn_seg)).T.copy()
+        return seg[0], seg[1], seg[2], seg[3]
+
+    def cast_rays(self, origin, angles, max_dist=1000.0, packed=None):
         """
-        Cast a ray from origin in given angle.
-        Returns (closest_point, wall)
+        Cast all rays from origin at once (rays x walls broadcast).
+        Returns (hit_x, hit_y, hit_idx); hit_idx is -1 where nothing was hit.
         """
-        direction = Vec2.from_angle(angle)
-        closest_t = max_dist
-        closest_point = None
-        hit_wall = None
-
-        for wall in self.walls:
-            seg = wall.get_segment()
-            p1, p2 = seg.points()
-            res = ray_segment_intersection(origin, direction, p1, p2)
-            if res is None:
-                continue
-            t, u = res
-            if 0 <= t < closest_t and 0 <= u <= 1:
-                closest_t = t
-                closest_point = origin + direction * t
-                hit_wall = wall
-
-        return closest_point, hit_wall
-
-
-def angle_diff(a, b):
-    # 두 각도 사이의 가장 짧은 방향(양수/음수)으로의 차이 [-pi, pi]
-    diff = a - b
-    while diff <= -math.pi:
-        diff += 2 * math.pi
-    while diff > math.pi:
-        diff -= math.pi * 2
-    return diff
-
-
-def ray_segment_intersection(origin, direction, a, b):
-    # origin : 레이가 시작되는 점(플레이어 위치)
-    # direction : 레이의 방향 단위 벡터
-    # a, b : 선분의 두 끝점
-    # t : 레이 식 "origin + t * direction"에서의 이동량
-    # u : 선분 식 "a + u * (b - a)"에서의 상대 위치(0~1 범위일 때 교차)
-    # origin + t * direction = a + u*(b-a)
-    v1 = origin - a
-    v2 = b - a
-    denom = direction.cross(v2)
-    if abs(denom) < 1e-6:
-        return None
-    t = v2.cross(v1) / denom
-    u = direction.cross(v1) / denom
-    if t < 0:
-        return None
-    return t, u
+        angles = np.asarray(angles, dtype=np.float64)
+        p1x, p1y, p2x, p2y = packed if packed is not None else self.pack_walls()
+        # 레이 방향의 cos/sin 은 여기서 한 번에 (벡터화) 계산해 모든 경로에서 재사용
+        cs = np.cos(angles)
+        sn = np.sin(angles)
+        # 커널 선택: BVH(numba) > C(전체 검사, 작업량이 클 때만) > numba 전체 검사 > NumPy
+        if NUMBA_AVAILABLE:
+            bvh = self.scene.static_bvh
+            if bvh is not None:
+                # 정적 벽이 많으면 BVH 로 레이가 지나가는 노드의 벽만 검사
+                return cast_all_rays_bvh(
+                    origin.x, origin.y, cs, sn, p1x, p1y, p2x, p2y,
+                    len(self.scene.static_walls), *bvh, max_dist
+                )
+        if C_KERNEL_AVAILABLE and (not NUMBA_AVAILABLE or len(angles) * len(p1x) >= C_KERNEL_MIN_WORK):
+            # 빌드된 C 커널 (OpenMP 멀티코어 + SIMD)
+            return cast_all_rays_c(origin.x, origin.y, cs, sn, p1x, p1y, p2x, p2y, max_dist)
+        if NUMBA_AVAILABLE:
+            return cast_all_rays(origin.x, origin.y, cs, sn, p1x, p1y, p2x, p2y, max_dist)
+
+        # numba가 없을 때: NumPy 브로드캐스트 경로
+        if len(angles) == 0 or len(p1x) == 0:
+            empty = np.empty(len(angles))
+            return empty, empty.copy(), np.full(len(angles), -1, dtype=np.intp)
+
+        dirx = cs[:, None]
+        diry = sn[:, None]
+
+        # (A, W)로 브로드캐스트: ray_segment_intersection 과 같은 식
+        v2x = p2x - p1x
+        v2y = p2y - p1y
+        v1x = origin.x - p1x
+        v1y = origin.y - p1y
+        # 두 끝점이 모두 레이 뒤쪽이면 (내적 < 0) 나눗셈 없이 제외
+        behind = ((v1x * dirx + v1y * diry) > 0) & (((origin.x - p2x) * dirx + (origin.y - p2y) * diry) > 0)
+        denom = dirx * v2y - diry * v2x
+        valid = ~behind & (np.abs(denom) >= 1e-6)
+        # 유효한 (레이, 벽) 쌍에 대해서만 나눗셈을 한다
+        t = np.full(denom.shape, np.inf)
+        u = np.zeros(denom.shape)
+        np.divide(v2x * v1y - v2y * v1x, denom, out=t, where=valid)
+        np.divide(dirx * v1y - diry * v1x, denom, out=u, where=valid)
+        t[(t < 0) | (u < 0) | (u > 1)] = np.inf
+
+        # 레이마다 가장 가까운 벽 선택 (C 레벨 argmin 한 번)
+        hit_idx = np.argmin(t, axis=1)
+        best_t = t[np.arange(len(angles)), hit_idx]
+        hit_idx[best_t >= max_dist] = -1
+        hit_x = origin.x + dirx[:, 0] * best_t
+        hit_y = origin.y + diry[:, 0] * best_t
+        return hit_x, hit_y, hit_idx
+
+
+def angle_gap_fillers(sorted_angles, max_gap, period=None):
+    # 정렬된 각도 배열에서 이웃 간격이 max_gap 보다 큰 구간마다
+    # ceil(gap / max_gap) - 1 개의 균일한 샘플을 만든다 (원래 각도는 포함하지 않음)
+    # period 가 주어지면 마지막 -> 처음(+period) 구간도 채운다
+    if len(sorted_angles) == 0:
+        return sorted_angles
+    starts = sorted_angles
+    ends = sorted_angles[1:]
+    if period is not None:
+        ends = np.append(ends, sorted_angles[0] + period)
+    else:
+        starts = sorted_angles[:-1]
+    gaps = ends - starts
+    n_fill = np.maximum(np.ceil(gaps / max_gap).astype(np.int64) - 1, 0)
+    total = int(n_fill.sum())
+    if total == 0:
+        return np.empty(0)
+    seg = np.repeat(np.arange(len(starts)), n_fill)
+    # 각 구간 안에서 1, 2, ..., n_fill 번째 샘플
+    k = np.arange(total) - np.repeat(np.cumsum(n_fill) - n_fill, n_fill) + 1
+    return starts[seg] + gaps[seg] * k / (n_fill[seg] + 1)
 
 
 # =========================
@@ -275,6 +269,44 @@ class Scene:
     def __init__(self):
         self.walls = []
         self.create_default_scene()
+        self.build_wall_arrays()
+
+    def build_wall_arrays(self):
+        # 정적 벽을 앞, 동적 벽을 뒤로 정렬하고 (N, 4) 배열 [p1x, p1y, p2x, p2y]로 묶는다
+        # 정적 벽 배열은 여기서 한 번만 만들고, 동적 벽 배열은 update 에서 갱신한다
+        self.walls.sort(key=lambda w: w.dynamic)
+        self.static_walls = [w for w in self.walls if not w.dynamic]
+        self.dynamic_walls = [w for w in self.walls if w.dynamic]
+        self.static_seg = np.array(
+            [[*w.base_p1, *w.base_p2] for w in self.static_walls], dtype=np.float64
+        ).reshape(-1, 4)
+        self.dyn_seg = np.empty((len(self.dynamic_walls), 4))
+        self.refresh_dynamic_seg()
+        # 동적 벽 속도 (D, 2) - 평행 이동/바운스는 이 배열로 한 번에 처리
+        self.dyn_vel = np.array(
+            [[w.velocity.x, w.velocity.y] for w in self.dynamic_walls], dtype=np.float64
+        ).reshape(-1, 2)
+        # 회전하는 동적 벽 (R 개): 베이스 끝점 (R, 2, 2), 회전 중심 (R, 2), 각속도/누적 각도 (R,)
+        rot = [i for i, w in enumerate(self.dynamic_walls)
+               if w.rotation_center is not None and w.angular_speed != 0.0]
+        self._rot_idx = np.array(rot, dtype=np.intp)
+        self._rot_base = np.array(
+            [[self.dynamic_walls[i].base_p1, self.dynamic_walls[i].base_p2] for i in rot], dtype=np.float64
+        ).reshape(-1, 2, 2)
+        self._rot_center = np.array(
+            [self.dynamic_walls[i].rotation_center for i in rot], dtype=np.float64
+        ).reshape(-1, 2)
+        self._rot_omega = np.array([self.dynamic_walls[i].angular_speed for i in rot], dtype=np.float64)
+        self._rot_theta = np.array([self.dynamic_walls[i].angle for i in rot], dtype=np.float64)
+        # 정적 벽이 충분히 많을 때만 BVH 를 만든다 (적으면 전체 검사가 더 빠름)
+        self.static_bvh = None
+        if len(self.static_walls) >= BVH_MIN_WALLS:
+            self.static_bvh = build_bvh(self.static_seg)
+
+    def refresh_dynamic_seg(self):
+        for i, wall in enumerate(self.dynamic_walls):
+            (p1x, p1y), (p2x, p2y) = wall.get_segment().points()
+            self.dyn_seg[i] = (p1x, p1y, p2x, p2y)
 
     def create_default_scene(self):
         # 기본 방(사각형) + 내부 벽 + 움직이는 벽들
@@ -314,16 +346,45 @@ class Scene:
         )
 
     def update(self, dt): # Scene.update
-        # 벽 업데이트 + 단순 바운스 처리
-        for wall in self.walls:
-            wall.update(dt)
-            if wall.dynamic and wall.velocity.length() > 0:
-                seg = wall.get_segment()
-                for p in [seg.p1, seg.p2]:
-                    if p.x < 80 or p.x > 720:
-                        wall.velocity.x *= -1
-                    if p.y < 80 or p.y > 520:
-                        wall.velocity.y *= -1
+        # 회전, 평행 이동 + 단순 바운스 모두 동적 벽 배열 전체에 한 번에 적용
+        # 정적 벽은 움직이지 않으므로 동적 벽만 갱신한다
+        if len(self._rot_idx):
+            # 베이스 끝점을 회전 중심 기준으로 (R, 2) 회전행렬을 브로드캐스트해서 회전
+            self._rot_theta += self._rot_omega * dt
+            c = np.cos(self._rot_theta)[:, None]
+            s = np.sin(self._rot_theta)[:, None]
+            center = self._rot_center[:, None, :]
+            rel = self._rot_base - center
+            rotated = np.stack((
+                center[..., 0] + rel[..., 0] * c - rel[..., 1] * s,
+                center[..., 1] + rel[..., 0] * s + rel[..., 1] * c,
+            ), axis=-1)
+            self.dyn_seg[self._rot_idx] = rotated.reshape(-1, 4)
+
+        moving = np.flatnonzero((self.dyn_vel != 0).any(axis=1))
+        if len(moving):
+            self.dyn_seg[moving] += np.tile(self.dyn_vel[moving] * dt, 2)
+            pts = self.dyn_seg[moving].reshape(-1, 2, 2)
+            flip_x = ((pts[:, :, 0] < 80) | (pts[:, :, 0] > 720)).any(axis=1)
+            flip_y = ((pts[:, :, 1] < 80) | (pts[:, :, 1] > 520)).any(axis=1)
+            self.dyn_vel[moving[flip_x], 0] *= -1
+            self.dyn_vel[moving[flip_y], 1] *= -1
+
+        # 그리기/외부에서 쓰는 Wall 객체에 결과를 돌려준다
+        for k, i in enumerate(self._rot_idx):
+            self.dynamic_walls[i].angle = float(self._rot_theta[k])
+        for i in np.union1d(self._rot_idx, moving):
+            wall = self.dynamic_walls[i]
+            x1, y1, x2, y2 = self.dyn_seg[i].tolist()
+            wall.segment.p1 = (x1, y1)
+            wall.segment.p2 = (x2, y2)
+        for i in moving:
+            wall = self.dynamic_walls[i]
+            wall.velocity.x, wall.velocity.y = self.dyn_vel[i].tolist()
+
+    def has_moving_walls(self):
+        # 회전하거나 이동 중인 동적 벽이 하나라도 있으면 True
+        return len(self._rot_idx) > 0 or bool(self.dyn_vel.any())
 
     def get_walls(self):
         return self.walls
@@ -339,10 +400,12 @@ class Game:
         pygame.display.set_caption("Visibility Polygon Engine Demo")
         self.clock = pygame.time.Clock()
         self.running = True
+        # 가시 다각형용 반투명 레이어 (매 프레임 새로 만들지 않고 재사용)
+        self.poly_surface = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
 
         # Engine state
         self.scene = Scene()
-        self.visibility_engine = VisibilityEngine(self.scene.get_walls())
+        self.visibility_engine = VisibilityEngine(self.scene)
 
         self.player_pos = Vec2(400, 300)
         self.player_speed = 200.0  # pixels per second
@@ -351,6 +414,26 @@ class Game:
         self.fov_angle = math.radians(90)  # 90 degree FOV
         self.full_360 = False
 
+        # 가시 다각형 캐시: 플레이어/시야/모드/벽이 그대로면 이전 결과를 재사용
+        self._vis_dirty = True
+        self._cached_poly = None
+
+        # HUD: 폰트와 고정 문구는 한 번만 렌더링, 모드 문구만 전환 시 다시 렌더링
+        self.font = pygame.font.SysFont("consolas", 18)
+        info_lines = [
+            "WASD / Arrow Keys: Move",
+            "Q/E: Rotate view direction",
+            "1: FOV mode (limited)",
+            "2: 360 mode",
+        ]
+        self.hud_surfs = [self.font.render(line, True, (220, 220, 220)) for line in info_lines]
+        self.mode_surf = None
+        self.render_mode_text()
+
+    def render_mode_text(self):
+        mode_text = "MODE: 360" if self.full_360 else "MODE: FOV"
+        self.mode_surf = self.font.render(mode_text, True, (220, 220, 220))
+
     def run(self):
         while self.running:
             dt = self.clock.tick(60) / 1000.0
@@ -370,9 +453,13 @@ class Game:
                 elif event.key == pygame.K_1:
                     # Limited FOV mode
                     self.full_360 = False
+                    self.render_mode_text()
+                    self._vis_dirty = True
                 elif event.key == pygame.K_2:
                     # 360-degree mode
                     self.full_360 = True
+                    self.render_mode_text()
+                    self._vis_dirty = True
 
         keys = pygame.key.get_pressed()
         move = Vec2(0, 0)
@@ -385,15 +472,21 @@ class Game:
         if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
             move.x += 1
 
-        if move.length() > 0:
+        if move.x and move.y:
+            # 대각선 이동일 때만 정규화(sqrt)가 필요하다
             move = move.normalized() * self.player_speed
+        elif move.length_sq() > 0:
+            # 상하좌우 한 방향이면 이미 단위 벡터
+            move = move * self.player_speed
         self.player_velocity = move
 
         # Q/E로 시야 방향 회전
         if keys[pygame.K_q]:
             self.facing_angle -= 2.0 * (1/60.0) * math.pi
+            self._vis_dirty = True
         if keys[pygame.K_e]:
             self.facing_angle += 2.0 * (1/60.0) * math.pi
+            self._vis_dirty = True
 
     def update(self, dt):
         # 플레이어 이동
@@ -406,23 +499,30 @@ class Game:
         # Scene 업데이트(회전/이동하는 벽)
         self.scene.update(dt)
 
+        if self.player_velocity.length_sq() > 0 or self.scene.has_moving_walls():
+            self._vis_dirty = True
+
     def draw(self):
         self.screen.fill((20, 20, 30))
 
-        # 가시 다각형 계산
-        poly_points, hit_walls = self.visibility_engine.compute_visibility_polygon(
-            self.player_pos, self.facing_angle, self.fov_angle, full_360=self.full_360
-        )
+        # 가시 다각형 계산 (변한 것이 없으면 캐시 사용)
+        if self._vis_dirty or self._cached_poly is None:
+            self._cached_poly = self.visibility_engine.compute_visibility_polygon(
+                self.player_pos, self.facing_angle, self.fov_angle, full_360=self.full_360
+            )
+            self._vis_dirty = False
+        poly_points, hit_mask = self._cached_poly
 
         # 가시 다각형 그리기 (반투명)
         if len(poly_points) >= 2:
-            poly_surface = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
+            poly_surface = self.poly_surface
+            poly_surface.fill((0, 0, 0, 0))
             if self.full_360:
                 # 360도 모드: 기존처럼 그대로 사용
-                draw_points = [p.tuple() for p in poly_points]
+                draw_points = poly_points
             else:
                 # FOV 모드: 플레이어를 꼭짓점으로 포함해서 부채꼴 모양으로 그림
-                draw_points = [self.player_pos.tuple()] + [p.tuple() for p in poly_points]
+                draw_points = np.vstack((self.player_pos.tuple(), poly_points))
 
             pygame.draw.polygon(
                 poly_surface,
@@ -432,16 +532,16 @@ class Game:
             self.screen.blit(poly_surface, (0, 0))
 
         # 벽 그리기 (가시 다각형에 맞은 벽은 빨간색으로 하이라이트)
-        for wall in self.scene.get_walls():
+        for i, wall in enumerate(self.scene.get_walls()):
             seg = wall.get_segment()
             color = (120, 120, 120)
-            if wall in hit_walls:
+            if hit_mask[i]:
                 color = (255, 80, 80)  #하이라이트
             pygame.draw.line(
                 self.screen,
                 color,
-                seg.p1.tuple(),
-                seg.p2.tuple(),
+                seg.p1,
+                seg.p2,
                 3
             )
 
@@ -458,19 +558,9 @@ class Game:
             2
         )
 
-        # HUD
-        font = pygame.font.SysFont("consolas", 18)
-        mode_text = "MODE: 360" if self.full_360 else "MODE: FOV"
-        info_lines = [
-            "WASD / Arrow Keys: Move",
-            "Q/E: Rotate view direction",
-            "1: FOV mode (limited)",
-            "2: 360 mode",
-            mode_text,
-        ]
+        # HUD (미리 렌더링해 둔 문구를 blit 만 한다)
         y = 8
-        for line in info_lines:
-            surf = font.render(line, True, (220, 220, 220))
+        for surf in self.hud_surfs + [self.mode_surf]:
             self.screen.blit(surf, (10, y))
             y += 20
 
@@ -0,0 +1,165 @@
+import numpy as np
+
+from vis_kernels import NUMBA_AVAILABLE, njit, ray_segment_intersection
+
+# =========================
+# Static Wall BVH
+# =========================
+# 정적 벽들에 대한 2D AABB BVH. 씬 로드 시 한 번만 만든다.
+# bounds : (N, 4) float64  [minx, miny, maxx, maxy]
+# links  : (N, 3) int32    [left 또는 first, right, count]
+#          count > 0 이면 leaf (order[first:first+count] 가 벽 인덱스)
+#          count == 0 이면 내부 노드 (자식 left, right)
+# order  : (S,) int32      leaf 가 가리키는 정적 벽 인덱스
+
+BVH_MIN_WALLS = 32   # 이보다 정적 벽이 적으면 전체 검사가 더 빠르다
+LEAF_SIZE = 2
+STACK_SIZE = 64
+AABB_PAD = 1e-6      # 축에 평행한 벽(두께 0)이 슬랩 테스트에서 빠지지 않도록
+
+
+def build_bvh(static_seg):
+    # static_seg : (S, 4) [p1x, p1y, p2x, p2y]
+    n = len(static_seg)
+    if n == 0:
+        return None
+    minx = np.minimum(static_seg[:, 0], static_seg[:, 2])
+    miny = np.minimum(static_seg[:, 1], static_seg[:, 3])
+    maxx = np.maximum(static_seg[:, 0], static_seg[:, 2])
+    maxy = np.maximum(static_seg[:, 1], static_seg[:, 3])
+    cx = (minx + maxx) * 0.5
+    cy = (miny + maxy) * 0.5
+
+    bounds = []
+    links = []
+    order = []
+
+    def build(idx):
+        node = len(bounds)
+        bounds.append((
+            minx[idx].min() - AABB_PAD, miny[idx].min() - AABB_PAD,
+            maxx[idx].max() + AABB_PAD, maxy[idx].max() + AABB_PAD,
+        ))
+        links.append([0, 0, 0])
+        if len(idx) <= LEAF_SIZE:
+            links[node] = [len(order), 0, len(idx)]
+            order.extend(idx.tolist())
+            return node
+        # 중심점 범위가 가장 긴 축으로 중앙값 분할
+        ex = cx[idx].max() - cx[idx].min()
+        ey = cy[idx].max() - cy[idx].min()
+        keys = cx[idx] if ex >= ey else cy[idx]
+        idx = idx[np.argsort(keys, kind="stable")]
+        mid = len(idx) // 2
+        left = build(idx[:mid])
+        right = build(idx[mid:])
+        links[node] = [left, right, 0]
+        return node
+
+    build(np.arange(n))
+    return (
+        np.array(bounds, dtype=np.float64),
+        np.array(links, dtype=np.int32),
+        np.array(order, dtype=np.int32),
+    )
+
+
+@njit(cache=True)
+def ray_aabb(ox, oy, dx, dy, minx, miny, maxx, maxy, t_max):
+    # 슬랩 테스트 (Williams et al.) - [0, t_max] 구간에서 박스와 만나는지
+    t0 = 0.0
+    t1 = t_max
+    if dx == 0.0:
+        if ox < minx or ox > maxx:
+            return False
+    else:
+        inv = 1.0 / dx
+        ta = (minx - ox) * inv
+        tb = (maxx - ox) * inv
+        if ta > tb:
+            ta, tb = tb, ta
+        t0 = max(t0, ta)
+        t1 = min(t1, tb)
+        if t0 > t1:
+            return False
+    if dy == 0.0:
+        if oy < miny or oy > maxy:
+            return False
+    else:
+        inv = 1.0 / dy
+        ta = (miny - oy) * inv
+        tb = (maxy - oy) * inv
+        if ta > tb:
+            ta, tb = tb, ta
+        t0 = max(t0, ta)
+        t1 = min(t1, tb)
+        if t0 > t1:
+            return False
+    return True
+
+
+@njit(cache=True)
+def cast_all_rays_bvh(ox, oy, dirx, diry, p1x, p1y, p2x, p2y, n_static,
+                      bounds, links, order, max_dist=1000.0):
+    # 정적 벽(0 ~ n_static-1)은 BVH 로, 동적 벽(n_static ~)은 전부 검사한다
+    # 반환은 vis_kernels.cast_all_rays 와 같다 (hitx, hity, hit_idx)
+    # 같은 거리에서 겹치면 인덱스가 작은 벽을 고른다 (전체 검사와 같은 결과)
+    n_rays = dirx.shape[0]
+    n_walls = p1x.shape[0]
+    hitx = np.empty(n_rays)
+    hity = np.empty(n_rays)
+    hit_idx = np.full(n_rays, -1, dtype=np.int32)
+    stack = np.empty(STACK_SIZE, dtype=np.int32)
+
+    for r in range(n_rays):
+        dx = dirx[r]
+        dy = diry[r]
+        closest_t = max_dist
+        best = -1
+
+        sp = 0
+        stack[sp] = 0
+        sp += 1
+        while sp > 0:
+            sp -= 1
+            node = stack[sp]
+            if not ray_aabb(ox, oy, dx, dy, bounds[node, 0], bounds[node, 1],
+                            bounds[node, 2], bounds[node, 3], closest_t):
+                continue
+            count = links[node, 2]
+            if count == 0:
+                stack[sp] = links[node, 0]
+                stack[sp + 1] = links[node, 1]
+                sp += 2
+                continue
+            first = links[node, 0]
+            for k in range(first, first + count):
+                w = order[k]
+                t = ray_segment_intersection(ox, oy, dx, dy, p1x[w], p1y[w], p2x[w], p2y[w])
+                # leaf 는 인덱스 순서대로 방문하지 않으므로 같은 거리면 인덱스로 비교한다
+                if t < closest_t or (t == closest_t and w < best):
+                    closest_t = t
+                    best = w
+
+        for w in range(n_static, n_walls):
+            t = ray_segment_intersection(ox, oy, dx, dy, p1x[w], p1y[w], p2x[w], p2y[w])
+            # 동적 벽은 모든 정적 벽보다 인덱스가 크므로 더 가까울 때만 바꾼다
+            if t < closest_t:
+                closest_t = t
+                best = w
+
+        hit_idx[r] = best
+        hitx[r] = ox + dx * closest_t
+        hity[r] = oy + dy * closest_t
+
+    return hitx, hity, hit_idx
+
+
+def warm_up(bvh):
+    # BVH 를 쓰는 씬에서만 미리 컴파일한다
+    if not NUMBA_AVAILABLE or bvh is None:
+        return
+    bounds, links, order = bvh
+    empty = np.empty(0)
+    # max_dist 도 명시해서 실제 호출(cast_rays)과 같은 시그니처로 컴파일되게 한다
+    cast_all_rays_bvh(0.0, 0.0, empty, empty, empty, empty, empty, empty, 0, bounds, links, order, 1000.0)